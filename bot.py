@@ -2,18 +2,29 @@
 import os
 import json
 import asyncio
+import atexit
 import base64
-import threading
+import itertools
+import time
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime
 from pathlib import Path
 
 import discord
 from discord.ext import commands
 from discord import option
-from flask import Flask
+from aiohttp import web
 from dotenv import load_dotenv
 import random
 import re
+import string
+import ahocorasick
+import async_timeout
+
+try:
+    import orjson  # much faster encode/decode; stdlib json is the fallback
+except ImportError:
+    orjson = None
 
 # -------------------------
 # Load environment variables
@@ -21,6 +32,8 @@ import re
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 OWNER_ID = int(os.getenv("OWNER_ID", "0"))  # Put your Discord ID in .env as OWNER_ID
+# optional comma-separated role IDs whose members count as admins (ADMIN_ROLE_IDS=123,456)
+ADMIN_ROLE_IDS = frozenset(int(x) for x in os.getenv("ADMIN_ROLE_IDS", "").split(",") if x.strip())
 PORT = int(os.getenv("PORT", "8080"))
 
 if not TOKEN:
@@ -32,20 +45,105 @@ if not TOKEN:
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
+def parse_json(raw):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def dump_json(data, indent=True):
+    # UTF-8 bytes either way; whole files are indented, JSONL lines are not
+    if orjson:
+        return orjson.dumps(data, option=(orjson.OPT_INDENT_2 if indent else 0) | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
 def load_json(fn, default):
     fp = DATA_DIR / fn
     if fp.exists():
         try:
-            return json.loads(fp.read_text(encoding="utf-8"))
+            return parse_json(fp.read_bytes())
         except Exception:
             return default
     else:
-        fp.write_text(json.dumps(default, indent=2), encoding="utf-8")
+        write_file_atomic(fn, dump_json(default))
         return default
 
+def write_file_atomic(fn, raw):
+    fp = DATA_DIR / fn
+    # write to a temp file first so a crash mid-write never leaves a truncated file
+    tmp = fp.with_name(fp.name + ".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, fp)
+
 def save_json(fn, data):
+    write_file_atomic(fn, dump_json(data))
+
+# append-only stores (logs, avatar history): one JSON object per line, so
+# recording an entry writes one line instead of re-encoding the whole file
+JSONL_MAX_BYTES = 2 * 1024 * 1024  # compact a store once its file grows past this
+_jsonl_files = {}  # {filename: open append handle}
+_jsonl_dirty = set()  # filenames with buffered, unflushed lines
+_jsonl_pending = {}  # {filename: rows appended while that store is being compacted}
+_jsonl_compacted_size = {}  # {filename: file size right after its last compaction}
+
+def read_jsonl(fn):
+    fp = DATA_DIR / fn
+    if not fp.exists():
+        return
+    with fp.open("rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield parse_json(line)
+            except Exception:
+                continue  # torn last line after a crash
+
+def append_jsonl(fn, row):
+    pending = _jsonl_pending.get(fn)
+    if pending is not None:
+        pending.append(row)  # the file is being rewritten; appended once that lands
+        return
+    f = _jsonl_files.get(fn)
+    if f is None:
+        f = _jsonl_files[fn] = (DATA_DIR / fn).open("ab", buffering=8192)
+    f.write(dump_json(row, indent=False) + b"\n")
+    _jsonl_dirty.add(fn)
+
+def rewrite_jsonl(fn, rows):
+    f = _jsonl_files.pop(fn, None)
+    if f:
+        f.close()
     fp = DATA_DIR / fn
-    fp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp = fp.with_name(fp.name + ".tmp")
+    with tmp.open("wb") as out:
+        for row in rows:
+            out.write(dump_json(row, indent=False) + b"\n")
+    os.replace(tmp, fp)
+
+def migrate_json_to_jsonl(old_fn, new_fn, to_rows):
+    # one-off upgrade from the old whole-file JSON format
+    if (DATA_DIR / old_fn).exists() and not (DATA_DIR / new_fn).exists():
+        rewrite_jsonl(new_fn, to_rows(load_json(old_fn, None)))
+
+AVATAR_HISTORY_MAX = 25  # per user; avatarhistory only ever shows the last 10
+
+def avatar_history_rows():
+    # last AVATAR_HISTORY_MAX rows per user, in file order
+    keep = {}
+    for row in read_jsonl("avatar_history.jsonl"):
+        keep.setdefault(row["uid"], deque(maxlen=AVATAR_HISTORY_MAX)).append(row)
+    return [row for rows in keep.values() for row in rows]
+
+def load_avatar_history():
+    hist = {}
+    for row in avatar_history_rows():
+        hist.setdefault(row["uid"], []).append(row["url"])
+    return hist
+
+# the old files held [] (logs) and {} (avatar history) when empty; None means unreadable
+migrate_json_to_jsonl("logs.json", "logs.jsonl", lambda old: old or [])
+migrate_json_to_jsonl("avatar_history.json", "avatar_history.jsonl", lambda old: (
+    {"uid": uid, "url": url, "ts": None} for uid, urls in (old or {}).items() for url in urls
+))
 
 # persistent files
 SETTINGS = load_json("settings.json", {
@@ -54,30 +152,94 @@ SETTINGS = load_json("settings.json", {
     "welcome_message": "Welcome {mention} to {guild}! You are member #{count}.",
     "blocked_words": [],   # list of blocked words
 })
-AVATAR_HISTORY = load_json("avatar_history.json", {})  # {user_id: [urls...]}
-REACT_ROLES = load_json("react_roles.json", {})  # {message_id: [{emoji, role_id}, ...]}
-LOGS = load_json("logs.json", [])  # list of log dicts
+AVATAR_HISTORY = load_avatar_history()  # {user_id: [urls...]}, rebuilt from avatar_history.jsonl
+# JSON keys are strings; keep int message ids in memory so reaction events need no str()
+# (dump_json turns them back into strings on save)
+REACT_ROLES = {int(k): v for k, v in load_json("react_roles.json", {}).items()}  # {message_id: [{emoji, role_id}, ...]}
+LOGS = deque(read_jsonl("logs.jsonl"), maxlen=1000)  # last 1000 log dicts
+LOGS_BY_USER = defaultdict(lambda: deque(maxlen=20))  # {user_id: last 20 log dicts}, what usage shows
+for _l in LOGS:
+    if _l.get("user_id") is not None:
+        LOGS_BY_USER[_l["user_id"]].append(_l)
 AFK = load_json("afk.json", {})  # {user_id: {"reason": str, "since": timestamp}}
 
+def rebuild_react_roles_index():
+    # derived {message_id: {emoji: role_id}} view of REACT_ROLES for O(1) reaction lookups;
+    # call after every change to REACT_ROLES (the on-disk shape stays the same)
+    global _react_roles_index, _react_roles_summary
+    _react_roles_index = {
+        mid: {str(rr["emoji"]): rr["role_id"] for rr in rows}
+        for mid, rows in REACT_ROLES.items()
+    }
+    _react_roles_summary = None  # list_react_roles re-renders on next call
+
+_react_roles_index = {}
+_react_roles_summary = None
+rebuild_react_roles_index()
+
 # -------------------------
-# Flask keepalive
+# Automod matcher
 # -------------------------
-app = Flask("bot_keepalive")
+# ASCII fast path: str.translate drops non-alphanumerics in one C-level pass
+_NORMALIZE_TABLE = str.maketrans("", "", "".join(
+    c for c in map(chr, range(128)) if c not in string.ascii_letters + string.digits
+))
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]")
+
+def normalize_text(text: str):
+    # strip everything but letters/digits so "b.a.d" still matches "bad"
+    if text.isascii():
+        return text.translate(_NORMALIZE_TABLE).lower()
+    return _NON_ALNUM_RE.sub("", text).lower()
+
+_automaton = None  # Aho-Corasick automaton over normalized blocked words (None if no words)
+_blocked_words_lower = {w.lower() for w in SETTINGS.get("blocked_words", [])}  # O(1) duplicate checks
+
+def rebuild_blocked_automaton():
+    # call after every change to SETTINGS["blocked_words"]
+    global _automaton
+    auto = ahocorasick.Automaton()
+    for bw in SETTINGS.get("blocked_words", []):
+        bw_norm = normalize_text(bw)
+        if bw_norm:
+            auto.add_word(bw_norm, bw)
+    if len(auto) == 0:
+        _automaton = None
+        return
+    auto.make_automaton()
+    _automaton = auto
 
-@app.route("/")
-def home():
-    return "Bot is running."
+rebuild_blocked_automaton()
 
-def run_flask():
-    app.run(host="0.0.0.0", port=PORT)
+# -------------------------
+# HTTP keepalive (served on the bot's own event loop, no extra thread)
+# -------------------------
+_keepalive_runner = None
 
-def start_keepalive():
-    t = threading.Thread(target=run_flask, daemon=True)
-    t.start()
+async def home(request):
+    return web.Response(text="Bot is running.")
+
+async def start_keepalive():
+    global _keepalive_runner
+    if _keepalive_runner is not None:
+        return  # on_ready fires again after reconnects
+    app = web.Application()
+    app.router.add_get("/", home)
+    _keepalive_runner = web.AppRunner(app)
+    await _keepalive_runner.setup()
+    await web.TCPSite(_keepalive_runner, "0.0.0.0", PORT).start()
 
 # -------------------------
 # Bot setup
 # -------------------------
+# uvloop is a faster drop-in event loop; py-cord grabs the current loop when
+# the Bot is created, so it has to be set before that
+try:
+    import uvloop
+    asyncio.set_event_loop(uvloop.new_event_loop())
+except ImportError:
+    pass
+
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
@@ -89,17 +251,137 @@ bot = commands.Bot(command_prefix="?", intents=intents)
 def is_owner_or_admin(user: discord.Member):
     if user.id == OWNER_ID:
         return True
+    # cheapest check first: the administrator bit, then the configured admin roles
+    # (the role scan is skipped entirely when ADMIN_ROLE_IDS is unset)
     try:
-        return user.guild_permissions.administrator
+        if user.guild_permissions.administrator:
+            return True
+        return bool(ADMIN_ROLE_IDS) and any(r.id in ADMIN_ROLE_IDS for r in user.roles)
     except Exception:
         return False
 
+# per-guild role lookup by name, kept in sync by the guild role events below
+ROLE_INDEX = {}  # {guild_id: {lowercased role name: Role}}
+
+def index_guild_roles(guild: discord.Guild):
+    idx = {}
+    for r in guild.roles:  # position order, so the lowest role wins like discord.utils.get
+        idx.setdefault(r.name.lower(), r)
+    ROLE_INDEX[guild.id] = idx
+
+def get_role_by_name(guild: discord.Guild, name: str):
+    if guild.id not in ROLE_INDEX:
+        index_guild_roles(guild)
+    return ROLE_INDEX[guild.id].get(name.lower())
+
+_flusher_task = None
+
 def add_log(entry: dict):
-    # keep only last 1000 logs to avoid huge files
+    # deque keeps the last 1000 in memory; the line is flushed to disk by _flusher
+    if len(LOGS) == LOGS.maxlen:
+        # the oldest log is about to fall off; drop it from its user's bucket too so
+        # usage only ever sees what LOGS holds (it may already have aged out of there)
+        old = LOGS[0]
+        bucket = LOGS_BY_USER.get(old.get("user_id"))
+        if bucket is not None:
+            if bucket and bucket[0] is old:
+                bucket.popleft()
+            if not bucket:
+                del LOGS_BY_USER[old["user_id"]]
     LOGS.append(entry)
-    if len(LOGS) > 1000:
-        del LOGS[:-1000]
-    save_json("logs.json", LOGS)
+    if entry.get("user_id") is not None:
+        LOGS_BY_USER[entry["user_id"]].append(entry)
+    append_jsonl("logs.jsonl", entry)
+
+def jsonl_needs_compaction(fn, f):
+    # compaction only shrinks a store down to its kept rows, which can be past
+    # JSONL_MAX_BYTES on their own; wait for real growth so that isn't every flush
+    return f.tell() > max(JSONL_MAX_BYTES, 2 * _jsonl_compacted_size.get(fn, 0))
+
+def compact_jsonl(fn):
+    # reads and rewrites the file only, so it is safe in a worker thread once the
+    # append handle is closed and new rows go to _jsonl_pending
+    rewrite_jsonl(fn, _jsonl_compactors[fn]())
+    _jsonl_compacted_size[fn] = (DATA_DIR / fn).stat().st_size
+
+def resume_jsonl(fn):
+    for row in _jsonl_pending.pop(fn, ()):
+        append_jsonl(fn, row)
+
+def flush_stores():
+    # synchronous version for exit; _flusher uses flush_stores_async
+    for fn in list(_jsonl_pending):
+        resume_jsonl(fn)  # a compaction cut short by shutdown
+    for fn in list(_jsonl_dirty):
+        _jsonl_dirty.discard(fn)
+        try:
+            f = _jsonl_files.get(fn)
+            if f:
+                f.flush()
+                if jsonl_needs_compaction(fn, f):
+                    _jsonl_files.pop(fn).close()
+                    compact_jsonl(fn)
+        except Exception as e:
+            _jsonl_dirty.add(fn)  # retried next tick
+            print(f"flush_stores: could not write {fn}: {e}")
+
+async def flush_stores_async():
+    for fn in list(_jsonl_dirty):
+        _jsonl_dirty.discard(fn)
+        try:
+            f = _jsonl_files.get(fn)
+            if f:
+                f.flush()
+                if jsonl_needs_compaction(fn, f):
+                    _jsonl_files.pop(fn).close()
+                    _jsonl_pending[fn] = []
+                    try:
+                        await asyncio.to_thread(compact_jsonl, fn)
+                    finally:
+                        resume_jsonl(fn)
+        except Exception as e:
+            _jsonl_dirty.add(fn)  # retried next tick
+            print(f"flush_stores: could not write {fn}: {e}")
+
+# what each store is compacted down to, read back from the file itself (so it
+# can run off the loop thread): logs keep the last LOGS.maxlen entries,
+# avatar history keeps the last AVATAR_HISTORY_MAX entries per user
+_jsonl_compactors = {
+    "logs.jsonl": lambda: deque(read_jsonl("logs.jsonl"), maxlen=LOGS.maxlen),
+    "avatar_history.jsonl": avatar_history_rows,
+}
+
+# whole-file JSON stores: commands DIRTY.add(filename) instead of calling
+# save_json, and _flusher writes each changed file at most once per tick
+DIRTY = set()
+_JSON_STORES = {
+    "settings.json": lambda: SETTINGS,
+    "react_roles.json": lambda: REACT_ROLES,
+    "afk.json": lambda: AFK,
+}
+
+def flush_json():
+    for fn in list(DIRTY):
+        save_json(fn, _JSON_STORES[fn]())
+    DIRTY.clear()
+
+async def _flusher():
+    while True:
+        await asyncio.sleep(1.0)
+        for fn in list(DIRTY):
+            DIRTY.discard(fn)
+            try:
+                # encode here, where nothing can mutate the data mid-dump; only the
+                # disk write goes to a worker thread
+                raw = dump_json(_JSON_STORES[fn]())
+                await asyncio.to_thread(write_file_atomic, fn, raw)
+            except Exception as e:
+                DIRTY.add(fn)  # keep the change and retry next tick
+                print(f"_flusher: could not save {fn}: {e}")
+        await flush_stores_async()
+
+atexit.register(flush_stores)
+atexit.register(flush_json)
 
 async def send_to_log_channel(guild: discord.Guild, embed: discord.Embed):
     cid = SETTINGS.get("log_channel_id")
@@ -117,8 +399,13 @@ async def send_to_log_channel(guild: discord.Guild, embed: discord.Embed):
 # -------------------------
 @bot.event
 async def on_ready():
+    global _flusher_task
     print(f"✅ Logged in as {bot.user} ({bot.user.id})")
-    start_keepalive()
+    if _flusher_task is None:
+        _flusher_task = bot.loop.create_task(_flusher())
+    for g in bot.guilds:
+        index_guild_roles(g)
+    await start_keepalive()
 
 @bot.event
 async def on_user_update(before: discord.User, after: discord.User):
@@ -130,11 +417,34 @@ async def on_user_update(before: discord.User, after: discord.User):
             lst = AVATAR_HISTORY.get(uid, [])
             if not lst or lst[-1] != url:
                 lst.append(url)
+                if len(lst) > AVATAR_HISTORY_MAX:
+                    del lst[:-AVATAR_HISTORY_MAX]
                 AVATAR_HISTORY[uid] = lst
-                save_json("avatar_history.json", AVATAR_HISTORY)
+                append_jsonl("avatar_history.jsonl", {"uid": uid, "url": url, "ts": datetime.utcnow().isoformat()})
     except Exception:
         pass
 
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    if before.name != after.name or before.position != after.position:
+        index_guild_roles(after.guild)
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    index_guild_roles(role.guild)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    index_guild_roles(role.guild)
+
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    index_guild_roles(guild)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    ROLE_INDEX.pop(guild.id, None)
+
 @bot.event
 async def on_member_join(member: discord.Member):
     # welcome message
@@ -154,25 +464,28 @@ async def on_message(message: discord.Message):
     if message.author.bot:
         return
 
-    # AFK mention handling: if someone mentions an AFK user inform them
-    for u in message.mentions:
-        info = AFK.get(str(u.id))
-        if info:
-            reason = info.get("reason","AFK")
-            since = datetime.fromtimestamp(info.get("since", 0)).strftime("%Y-%m-%d %H:%M:%S")
-            await message.channel.send(f"🔕 {u.display_name} is AFK: {reason} (since {since})")
-
-    # automod: blocked words detection (normalize incoming message)
-    content_norm = re.sub(r"[^A-Za-z0-9]", "", message.content).lower()
-    for bw in SETTINGS.get("blocked_words", []):
-        bw_norm = re.sub(r"[^A-Za-z0-9]", "", bw).lower()
-        if bw_norm and bw_norm in content_norm:
-            # skip admins
-            try:
-                if is_owner_or_admin(message.author):
-                    break
-            except Exception:
-                pass
+    # AFK mention handling: if someone mentions an AFK user inform them (one message for all of them)
+    if AFK and message.mentions:
+        seen = set()
+        lines = []
+        for u in message.mentions:
+            if u.id in seen:
+                continue
+            seen.add(u.id)
+            info = AFK.get(str(u.id))
+            if info:
+                reason = info.get("reason","AFK")
+                since = datetime.fromtimestamp(info.get("since", 0)).strftime("%Y-%m-%d %H:%M:%S")
+                lines.append(f"🔕 {u.display_name} is AFK: {reason} (since {since})")
+        if lines:
+            await message.channel.send("\n".join(lines))
+
+    # automod: blocked words detection (normalize incoming message once, single automaton pass)
+    if _automaton is not None:
+        content_norm = normalize_text(message.content)
+        hit = next(_automaton.iter(content_norm), None)
+        if hit and not is_owner_or_admin(message.author):
+            bw = hit[1]
             # delete and warn
             try:
                 await message.delete()
@@ -201,40 +514,62 @@ async def on_message(message: discord.Message):
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     # reaction role handling
     try:
-        mid = str(payload.message_id)
-        if mid in REACT_ROLES:
-            rows = REACT_ROLES[mid]
-            for rr in rows:
-                if str(rr["emoji"]) == str(payload.emoji):
-                    guild = bot.get_guild(payload.guild_id)
-                    role = guild.get_role(rr["role_id"])
-                    member = guild.get_member(payload.user_id)
-                    if role and member:
-                        await member.add_roles(role, reason="Reaction role added")
+        row = _react_roles_index.get(payload.message_id)
+        role_id = row and row.get(str(payload.emoji))
+        if role_id:
+            guild = bot.get_guild(payload.guild_id)
+            role = guild.get_role(role_id)
+            member = guild.get_member(payload.user_id)
+            if role and member:
+                await member.add_roles(role, reason="Reaction role added")
     except Exception:
         pass
 
 @bot.event
 async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
     try:
-        mid = str(payload.message_id)
-        if mid in REACT_ROLES:
-            rows = REACT_ROLES[mid]
-            for rr in rows:
-                if str(rr["emoji"]) == str(payload.emoji):
-                    guild = bot.get_guild(payload.guild_id)
-                    role = guild.get_role(rr["role_id"])
-                    member = guild.get_member(payload.user_id)
-                    if role and member:
-                        await member.remove_roles(role, reason="Reaction role removed")
+        row = _react_roles_index.get(payload.message_id)
+        role_id = row and row.get(str(payload.emoji))
+        if role_id:
+            guild = bot.get_guild(payload.guild_id)
+            role = guild.get_role(role_id)
+            member = guild.get_member(payload.user_id)
+            if role and member:
+                await member.remove_roles(role, reason="Reaction role removed")
     except Exception:
         pass
 
 # -------------------------
 # Utilities / Helpers
 # -------------------------
-def make_basic_embed(title="Info", color=discord.Color.blurple()):
-    return discord.Embed(title=title, color=color, timestamp=datetime.utcnow())
+# embed colors, built once instead of per command
+_BLURPLE = discord.Color.blurple()
+_DARK_GRAY = discord.Color.dark_gray()
+_GREEN = discord.Color.green()
+_TEAL = discord.Color.teal()
+_DARK_GOLD = discord.Color.dark_gold()
+_DARK_PURPLE = discord.Color.dark_purple()
+_ORANGE = discord.Color.orange()
+
+def make_basic_embed(title="Info", color=_BLURPLE):
+    return discord.Embed(title=title, color=color, timestamp=discord.utils.utcnow())
+
+# small LRU of fetched users for banner: banner data only comes from a REST fetch_user
+USER_CACHE_MAX = 512
+USER_CACHE_TTL = 600  # seconds
+_user_cache = OrderedDict()  # {user_id: (fetched_at, discord.User)}
+
+async def fetch_user_cached(uid: int):
+    hit = _user_cache.get(uid)
+    if hit and time.monotonic() - hit[0] < USER_CACHE_TTL:
+        _user_cache.move_to_end(uid)
+        return hit[1]
+    user = await bot.fetch_user(uid)
+    _user_cache[uid] = (time.monotonic(), user)
+    _user_cache.move_to_end(uid)
+    if len(_user_cache) > USER_CACHE_MAX:
+        _user_cache.popitem(last=False)
+    return user
 
 def record_command_usage(ctx, name, extra=""):
     entry = {
@@ -248,16 +583,19 @@ def record_command_usage(ctx, name, extra=""):
         "extra": extra
     }
     add_log(entry)
-    # also send embed to log channel if set
-    emb = discord.Embed(title=f"Command: {name}", color=discord.Color.dark_gray(), timestamp=datetime.utcnow())
+    # also send embed to log channel if set; most servers never set one, so
+    # don't build an embed just for send_to_log_channel to drop it
+    guild = getattr(ctx, "guild", None)
+    if not guild or not SETTINGS.get("log_channel_id"):
+        return
+    emb = discord.Embed(title=f"Command: {name}", color=_DARK_GRAY, timestamp=discord.utils.utcnow())
     emb.add_field(name="User", value=f"{ctx.author} ({ctx.author.id})", inline=False)
     emb.add_field(name="Guild", value=f"{getattr(getattr(ctx,'guild',None),'name', 'DM')} ({entry['guild_id']})", inline=True)
     emb.add_field(name="Channel", value=f"{getattr(getattr(ctx,'channel',None),'name','-')} ({entry['channel_id']})", inline=True)
     if extra:
         emb.add_field(name="Extra", value=str(extra), inline=False)
-    guild = getattr(ctx, "guild", None)
-    if guild:
-        asyncio.create_task(send_to_log_channel(guild, emb))
+    # bot.loop is fixed for the bot's lifetime; skips the running-loop lookup
+    bot.loop.create_task(send_to_log_channel(guild, emb))
 
 # -------------------------
 # Commands
@@ -275,54 +613,46 @@ async def pong(ctx):
     record_command_usage(ctx, "pong")
 
 # ---- serverinfo (/ and ?)
-@bot.slash_command(description="Get information about this server")
-async def serverinfo(ctx):
-    g = ctx.guild
-    emb = make_basic_embed(f"Server Info — {g.name}")
+def _serverinfo_embed(g, color=_BLURPLE):
+    emb = make_basic_embed(f"Server Info — {g.name}", color=color)
     emb.set_thumbnail(url=g.icon.url if g.icon else discord.Embed.Empty)
     emb.add_field(name="Owner", value=f"{g.owner} ({g.owner.id})", inline=True)
     emb.add_field(name="Members", value=str(g.member_count), inline=True)
     emb.add_field(name="Roles", value=str(len(g.roles)), inline=True)
     emb.add_field(name="Channels", value=str(len(g.channels)), inline=True)
     emb.add_field(name="Created", value=g.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-    await ctx.respond(embed=emb)
+    return emb
+
+@bot.slash_command(description="Get information about this server")
+async def serverinfo(ctx):
+    await ctx.respond(embed=_serverinfo_embed(ctx.guild))
     record_command_usage(ctx, "serverinfo")
 
 @bot.command(name="serverinfo")
 async def serverinfo_prefix(ctx):
-    g = ctx.guild
-    emb = make_basic_embed(f"Server Info — {g.name}", color=discord.Color.green())
-    emb.set_thumbnail(url=g.icon.url if g.icon else discord.Embed.Empty)
-    emb.add_field(name="Owner", value=f"{g.owner} ({g.owner.id})", inline=True)
-    emb.add_field(name="Members", value=str(g.member_count), inline=True)
-    emb.add_field(name="Roles", value=str(len(g.roles)), inline=True)
-    emb.add_field(name="Channels", value=str(len(g.channels)), inline=True)
-    emb.add_field(name="Created", value=g.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_serverinfo_embed(ctx.guild, _GREEN))
     record_command_usage(ctx, "serverinfo")
 
 # ---- avatar & avatarhistory
+def _avatar_embed(target):
+    emb = make_basic_embed(f"Avatar — {target}")
+    emb.set_image(url=target.display_avatar.url)
+    return emb
+
 @bot.slash_command(description="Get a user's avatar")
 @option("user", discord.Member, description="User to fetch (leave empty for yourself)", required=False)
 async def avatar(ctx, user: discord.Member = None):
     target = user or ctx.author
-    emb = make_basic_embed(f"Avatar — {target}")
-    emb.set_image(url=target.display_avatar.url)
-    await ctx.respond(embed=emb)
+    await ctx.respond(embed=_avatar_embed(target))
     record_command_usage(ctx, "avatar", f"target={target.id}")
 
 @bot.command()
 async def avatar(ctx, member: discord.Member = None):
     member = member or ctx.author
-    emb = make_basic_embed(f"Avatar — {member}")
-    emb.set_image(url=member.display_avatar.url)
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_avatar_embed(member))
     record_command_usage(ctx, "avatar", f"target={member.id}")
 
-@bot.slash_command(description="Show a user's avatar history (tracked)")
-@option("user", discord.User, description="User to check", required=False)
-async def avatarhistory(ctx, user: discord.User = None):
-    target = user or ctx.author
+def _avatarhistory_embed(target):
     arr = AVATAR_HISTORY.get(str(target.id), [])
     emb = make_basic_embed(f"Avatar History — {target}")
     if not arr:
@@ -332,56 +662,47 @@ async def avatarhistory(ctx, user: discord.User = None):
             emb.add_field(name=f"#{i}", value=url, inline=False)
         # show last avatar as image
         emb.set_image(url=arr[-1])
-    await ctx.respond(embed=emb)
+    return emb
+
+@bot.slash_command(description="Show a user's avatar history (tracked)")
+@option("user", discord.User, description="User to check", required=False)
+async def avatarhistory(ctx, user: discord.User = None):
+    target = user or ctx.author
+    await ctx.respond(embed=_avatarhistory_embed(target))
     record_command_usage(ctx, "avatarhistory", f"target={target.id}")
 
 @bot.command()
 async def avatarhistory(ctx, user: discord.User = None):
     user = user or ctx.author
-    arr = AVATAR_HISTORY.get(str(user.id), [])
-    emb = make_basic_embed(f"Avatar History — {user}")
-    if not arr:
-        emb.description = "No avatar history tracked for this user."
-    else:
-        for i, url in enumerate(arr[-10:], start=1):
-            emb.add_field(name=f"#{i}", value=url, inline=False)
-        emb.set_image(url=arr[-1])
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_avatarhistory_embed(user))
     record_command_usage(ctx, "avatarhistory", f"target={user.id}")
 
 # ---- banner
-@bot.slash_command(description="Get a user's banner")
-@option("user", discord.User, description="User to fetch banner (optional)", required=False)
-async def banner(ctx, user: discord.User = None):
-    target = user or ctx.author
-    fuser = await bot.fetch_user(target.id)
+async def _banner_embed(target):
+    fuser = await fetch_user_cached(target.id)
     if fuser.banner:
         emb = make_basic_embed(f"Banner — {target}")
         emb.set_image(url=fuser.banner.url)
     else:
         emb = make_basic_embed("Banner")
         emb.description = "This user has no profile banner."
-    await ctx.respond(embed=emb)
+    return emb
+
+@bot.slash_command(description="Get a user's banner")
+@option("user", discord.User, description="User to fetch banner (optional)", required=False)
+async def banner(ctx, user: discord.User = None):
+    target = user or ctx.author
+    await ctx.respond(embed=await _banner_embed(target))
     record_command_usage(ctx, "banner", f"target={target.id}")
 
 @bot.command()
 async def banner(ctx, user: discord.User = None):
     user = user or ctx.author
-    fuser = await bot.fetch_user(user.id)
-    if fuser.banner:
-        emb = make_basic_embed(f"Banner — {user}")
-        emb.set_image(url=fuser.banner.url)
-    else:
-        emb = make_basic_embed("Banner")
-        emb.description = "This user has no profile banner."
-    await ctx.send(embed=emb)
+    await ctx.send(embed=await _banner_embed(user))
     record_command_usage(ctx, "banner", f"target={user.id}")
 
 # ---- base64 encode/decode
-@bot.slash_command(description="Convert text to/from Base64")
-@option("mode", str, description="encode or decode", required=True, choices=["encode","decode"])
-@option("text", str, description="Text to convert", required=True)
-async def base64cmd(ctx, mode: str, text: str):
+def _base64_embed(mode, text):
     if mode == "encode":
         out = base64.b64encode(text.encode()).decode()
     else:
@@ -391,7 +712,13 @@ async def base64cmd(ctx, mode: str, text: str):
             out = "❗ Failed to decode base64 (invalid input)."
     emb = make_basic_embed(f"Base64 {mode}")
     emb.add_field(name="Result", value=f"```\n{out}\n```", inline=False)
-    await ctx.respond(embed=emb)
+    return emb
+
+@bot.slash_command(description="Convert text to/from Base64")
+@option("mode", str, description="encode or decode", required=True, choices=["encode","decode"])
+@option("text", str, description="Text to convert", required=True)
+async def base64cmd(ctx, mode: str, text: str):
+    await ctx.respond(embed=_base64_embed(mode, text))
     record_command_usage(ctx, "base64", f"{mode}")
 
 @bot.command(name="base64")
@@ -399,85 +726,76 @@ async def base64_prefix(ctx, mode: str, *, text: str):
     if mode not in ["encode","decode"]:
         await ctx.send("Usage: `?base64 encode|decode <text>`")
         return
-    if mode == "encode":
-        out = base64.b64encode(text.encode()).decode()
-    else:
-        try:
-            out = base64.b64decode(text.encode()).decode()
-        except Exception:
-            out = "❗ Failed to decode base64 (invalid input)."
-    emb = make_basic_embed(f"Base64 {mode}")
-    emb.add_field(name="Result", value=f"```\n{out}\n```", inline=False)
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_base64_embed(mode, text))
     record_command_usage(ctx, "base64", f"{mode}")
 
 # ---- joined
+def _joined_embed(member, color=_BLURPLE):
+    emb = make_basic_embed(f"Join Date — {member}", color=color)
+    emb.add_field(name="Joined", value=member.joined_at.strftime("%Y-%m-%d %H:%M:%S") if member.joined_at else "Unknown", inline=False)
+    emb.add_field(name="Account Created", value=member.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
+    return emb
+
 @bot.slash_command(description="See when a user joined the server")
 @option("user", discord.Member, description="User to check (default: you)", required=False)
 async def joined(ctx, user: discord.Member = None):
     member = user or ctx.author
-    emb = make_basic_embed(f"Join Date — {member}")
-    emb.add_field(name="Joined", value=member.joined_at.strftime("%Y-%m-%d %H:%M:%S") if member.joined_at else "Unknown", inline=False)
-    emb.add_field(name="Account Created", value=member.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-    await ctx.respond(embed=emb)
+    await ctx.respond(embed=_joined_embed(member))
     record_command_usage(ctx, "joined", f"target={member.id}")
 
 @bot.command()
 async def joined(ctx, member: discord.Member = None):
     member = member or ctx.author
-    emb = make_basic_embed(f"Join Date — {member}", color=discord.Color.teal())
-    emb.add_field(name="Joined", value=member.joined_at.strftime("%Y-%m-%d %H:%M:%S") if member.joined_at else "Unknown", inline=False)
-    emb.add_field(name="Account Created", value=member.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_joined_embed(member, _TEAL))
     record_command_usage(ctx, "joined", f"target={member.id}")
 
 # ---- permissions
+def _permissions_embed(member, color=_BLURPLE):
+    perm_txt = ", ".join(p[0].replace("_"," ").title() for p in member.guild_permissions if p[1])
+    emb = make_basic_embed(f"Permissions — {member}", color=color)
+    emb.description = perm_txt or "No special permissions."
+    return emb
+
 @bot.slash_command(description="List a user's server permissions")
 @option("user", discord.Member, description="User (optional)", required=False)
 async def permissions(ctx, user: discord.Member = None):
     m = user or ctx.author
-    perms = [n.replace("_"," ").title() for n,v in m.guild_permissions if v] if False else None
-    # simpler: stringify guild_permissions
-    perm_txt = ", ".join([p[0] for p in m.guild_permissions if p[1]])
-    emb = make_basic_embed(f"Permissions — {m}")
-    emb.description = perm_txt or "No special permissions."
-    await ctx.respond(embed=emb)
+    await ctx.respond(embed=_permissions_embed(m))
     record_command_usage(ctx, "permissions", f"target={m.id}")
 
 @bot.command()
 async def permissions(ctx, member: discord.Member = None):
     member = member or ctx.author
-    perm_txt = ", ".join([p[0] for p in member.guild_permissions if p[1]])
-    emb = make_basic_embed(f"Permissions — {member}", color=discord.Color.dark_gold())
-    emb.description = perm_txt or "No special permissions."
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_permissions_embed(member, _DARK_GOLD))
     record_command_usage(ctx, "permissions", f"target={member.id}")
 
 # ---- roles (list roles a user has)
+def _roles_embed(member, color=_BLURPLE):
+    role_list = [r.mention for r in member.roles if r.name != "@everyone"]
+    emb = make_basic_embed(f"Roles — {member}", color=color)
+    emb.description = ", ".join(role_list) if role_list else "No roles."
+    return emb
+
 @bot.slash_command(description="List all roles a user has in the server")
 @option("user", discord.Member, description="User to check (optional)", required=False)
 async def roles(ctx, user: discord.Member = None):
     m = user or ctx.author
-    role_list = [r.mention for r in m.roles if r.name != "@everyone"]
-    emb = make_basic_embed(f"Roles — {m}")
-    emb.description = ", ".join(role_list) if role_list else "No roles."
-    await ctx.respond(embed=emb)
+    await ctx.respond(embed=_roles_embed(m))
     record_command_usage(ctx, "roles", f"target={m.id}")
 
 @bot.command()
 async def roles(ctx, member: discord.Member = None):
     member = member or ctx.author
-    role_list = [r.mention for r in member.roles if r.name != "@everyone"]
-    emb = make_basic_embed(f"Roles — {member}", color=discord.Color.dark_purple())
-    emb.description = ", ".join(role_list) if role_list else "No roles."
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_roles_embed(member, _DARK_PURPLE))
     record_command_usage(ctx, "roles", f"target={member.id}")
 
 # ---- serverbanner, serverboosts
 @bot.slash_command(description="Show the server banner")
 async def serverbanner(ctx):
-    gid = ctx.guild.id
-    g = await bot.fetch_guild(gid)
+    g = ctx.guild
+    # cached guild normally has the banner; only hit REST if it looks stale
+    if g.banner is None and "BANNER" in getattr(g, "features", []):
+        g = await bot.fetch_guild(g.id)
     if g.banner:
         emb = make_basic_embed("Server Banner")
         emb.set_image(url=g.banner.url)
@@ -497,61 +815,59 @@ async def serverboosts(ctx):
     record_command_usage(ctx, "serverboosts")
 
 # ---- profileinfo
-@bot.slash_command(description="Get detailed profile info for a user")
-@option("user", discord.User, description="User to fetch", required=False)
-async def profileinfo(ctx, user: discord.User = None):
-    user = user or ctx.author
-    fetched = await bot.fetch_user(user.id)
-    emb = make_basic_embed(f"Profile — {user}")
-    emb.set_thumbnail(url=fetched.display_avatar.url)
+def _profileinfo_embed(user, color=_BLURPLE):
+    # display_avatar is already on the resolved User/Member; no fetch needed
+    emb = make_basic_embed(f"Profile — {user}", color=color)
+    emb.set_thumbnail(url=user.display_avatar.url)
     emb.add_field(name="ID", value=str(user.id), inline=True)
     emb.add_field(name="Bot?", value=str(user.bot), inline=True)
     emb.add_field(name="Created", value=user.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
     if isinstance(user, discord.Member):
         emb.add_field(name="Joined", value=user.joined_at.strftime("%Y-%m-%d %H:%M:%S") if user.joined_at else "Unknown", inline=False)
-    await ctx.respond(embed=emb)
+    return emb
+
+@bot.slash_command(description="Get detailed profile info for a user")
+@option("user", discord.User, description="User to fetch", required=False)
+async def profileinfo(ctx, user: discord.User = None):
+    user = user or ctx.author
+    await ctx.respond(embed=_profileinfo_embed(user))
     record_command_usage(ctx, "profileinfo", f"target={user.id}")
 
 @bot.command()
 async def profileinfo(ctx, user: discord.User = None):
     user = user or ctx.author
-    fetched = await bot.fetch_user(user.id)
-    emb = make_basic_embed(f"Profile — {user}", color=discord.Color.orange())
-    emb.set_thumbnail(url=fetched.display_avatar.url)
-    emb.add_field(name="ID", value=str(user.id), inline=True)
-    emb.add_field(name="Bot?", value=str(user.bot), inline=True)
-    emb.add_field(name="Created", value=user.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-    if isinstance(user, discord.Member):
-        emb.add_field(name="Joined", value=user.joined_at.strftime("%Y-%m-%d %H:%M:%S") if user.joined_at else "Unknown", inline=False)
-    await ctx.send(embed=emb)
+    await ctx.send(embed=_profileinfo_embed(user, _ORANGE))
     record_command_usage(ctx, "profileinfo", f"target={user.id}")
 
 # ---- 8ball
+_rng = random.Random()  # bot-local RNG for 8ball/ask answers
 EIGHT_BALL = ["Yes.", "No.", "Maybe.", "Ask again later.", "Definitely.", "I doubt it."]
 @bot.slash_command(description="Ask the magic 8ball a question")
 @option("question", str, description="Your question", required=True)
 async def _8ball(ctx, question: str):
-    await ctx.respond(random.choice(EIGHT_BALL))
+    await ctx.respond(_rng.choice(EIGHT_BALL))
     record_command_usage(ctx, "8ball", question)
 
 @bot.command(name="8ball")
 async def eightball(ctx, *, question: str):
-    await ctx.send(random.choice(EIGHT_BALL))
+    await ctx.send(_rng.choice(EIGHT_BALL))
     record_command_usage(ctx, "8ball", question)
 
 # ---- afk
+def _set_afk(user_id, reason):
+    AFK[str(user_id)] = {"reason": reason, "since": datetime.utcnow().timestamp()}
+    DIRTY.add("afk.json")
+
 @bot.slash_command(description="Set your AFK status")
 @option("reason", str, description="AFK reason", required=False)
 async def afk(ctx, reason: str = "AFK"):
-    AFK[str(ctx.author.id)] = {"reason": reason, "since": datetime.utcnow().timestamp()}
-    save_json("afk.json", AFK)
+    _set_afk(ctx.author.id, reason)
     await ctx.respond(f"Set AFK: {reason}")
     record_command_usage(ctx, "afk", reason)
 
 @bot.command()
 async def afk(ctx, *, reason: str = "AFK"):
-    AFK[str(ctx.author.id)] = {"reason": reason, "since": datetime.utcnow().timestamp()}
-    save_json("afk.json", AFK)
+    _set_afk(ctx.author.id, reason)
     await ctx.send(f"Set AFK: {reason}")
     record_command_usage(ctx, "afk", reason)
 
@@ -563,7 +879,7 @@ async def setlog(ctx, channel: discord.TextChannel):
         await ctx.respond("You must be an admin to run that.")
         return
     SETTINGS["log_channel_id"] = channel.id
-    save_json("settings.json", SETTINGS)
+    DIRTY.add("settings.json")
     await ctx.respond(f"Log channel set to {channel.mention}")
     record_command_usage(ctx, "setlog", f"channel={channel.id}")
 
@@ -573,7 +889,7 @@ async def disable_log_channel(ctx):
         await ctx.respond("You must be an admin to run that.")
         return
     SETTINGS["log_channel_id"] = None
-    save_json("settings.json", SETTINGS)
+    DIRTY.add("settings.json")
     await ctx.respond("Log channel disabled.")
     record_command_usage(ctx, "disable_log_channel")
 
@@ -588,7 +904,7 @@ async def welcomer(ctx, channel: discord.TextChannel, message: str = None):
     SETTINGS["welcome_channel_id"] = channel.id
     if message:
         SETTINGS["welcome_message"] = message
-    save_json("settings.json", SETTINGS)
+    DIRTY.add("settings.json")
     await ctx.respond(f"Welcome channel set to {channel.mention}.")
     record_command_usage(ctx, "welcomer", f"channel={channel.id}")
 
@@ -599,11 +915,13 @@ async def add_blocked_word(ctx, word: str):
     if not is_owner_or_admin(ctx.author):
         await ctx.respond("Admin only.")
         return
-    if word.lower() in (w.lower() for w in SETTINGS.get("blocked_words", [])):
+    if word.lower() in _blocked_words_lower:
         await ctx.respond("That word is already blocked.")
         return
     SETTINGS["blocked_words"].append(word)
-    save_json("settings.json", SETTINGS)
+    _blocked_words_lower.add(word.lower())
+    rebuild_blocked_automaton()
+    DIRTY.add("settings.json")
     await ctx.respond(f"Blocked word added: `{word}`")
     record_command_usage(ctx, "add_blocked_word", word)
 
@@ -614,7 +932,9 @@ async def remove_blocked_word(ctx, word: str):
         await ctx.respond("Admin only.")
         return
     SETTINGS["blocked_words"] = [w for w in SETTINGS.get("blocked_words", []) if w.lower() != word.lower()]
-    save_json("settings.json", SETTINGS)
+    _blocked_words_lower.discard(word.lower())
+    rebuild_blocked_automaton()
+    DIRTY.add("settings.json")
     await ctx.respond(f"Blocked word removed: `{word}`")
     record_command_usage(ctx, "remove_blocked_word", word)
 
@@ -642,11 +962,12 @@ async def reactrolecreate(ctx, channel: discord.TextChannel, message: str, role:
     except Exception:
         # try convert emoji by name => user may pass literal emoji
         pass
-    mid = str(sent.id)
+    mid = sent.id
     entry = REACT_ROLES.get(mid, [])
     entry.append({"emoji": emoji, "role_id": role.id})
     REACT_ROLES[mid] = entry
-    save_json("react_roles.json", REACT_ROLES)
+    rebuild_react_roles_index()
+    DIRTY.add("react_roles.json")
     await ctx.respond(f"Reaction role created in {channel.mention}")
     record_command_usage(ctx, "reactrolecreate", f"mid={mid}, role={role.id}, emoji={emoji}")
 
@@ -658,7 +979,7 @@ async def purge(ctx, amount: int):
         await ctx.respond("You need Manage Messages permission to use this.")
         return
     amount = max(2, min(amount, 100))
-    deleted = await ctx.channel.purge(limit=amount)
+    deleted = await ctx.channel.purge(limit=amount, bulk=True, reason=f"purge by {ctx.author}")
     await ctx.respond(f"Deleted {len(deleted)} messages.", ephemeral=True)
     record_command_usage(ctx, "purge", f"amount={amount}")
 
@@ -666,8 +987,8 @@ async def purge(ctx, amount: int):
 @commands.has_permissions(manage_messages=True)
 async def purge(ctx, amount: int):
     amount = max(2, min(amount, 100))
-    deleted = await ctx.channel.purge(limit=amount)
-    await ctx.send(f"Deleted {len(deleted)} messages.", delete_after=8)
+    # the invoking message is purged too, which is the confirmation; no follow-up send
+    await ctx.channel.purge(limit=amount, bulk=True, reason=f"purge by {ctx.author}")
     record_command_usage(ctx, "purge", f"amount={amount}")
 
 # ---- mute role add/remove
@@ -679,16 +1000,16 @@ async def muterole(ctx, member: discord.Member, action: str):
         await ctx.respond("You do not have permission to do that.")
         return
     guild = ctx.guild
-    role = discord.utils.get(guild.roles, name="Muted")
+    role = get_role_by_name(guild, "Muted")
     if not role:
         # create role
         role = await guild.create_role(name="Muted", reason="Muted role created by bot")
-        # attempt to set channel overwrite to deny send_messages
-        for ch in guild.text_channels:
-            try:
-                await ch.set_permissions(role, send_messages=False, add_reactions=False)
-            except Exception:
-                pass
+        # attempt to set channel overwrite to deny send_messages (all channels at once;
+        # py-cord's rate limiter paces the requests, failures are ignored as before)
+        await asyncio.gather(
+            *(ch.set_permissions(role, send_messages=False, add_reactions=False) for ch in guild.text_channels),
+            return_exceptions=True,
+        )
     if action == "add":
         await member.add_roles(role, reason="Muted via command")
         await ctx.respond(f"{member.mention} has been muted.")
@@ -698,6 +1019,19 @@ async def muterole(ctx, member: discord.Member, action: str):
     record_command_usage(ctx, "muterole", f"{action} {member.id}")
 
 # ---- nuke (channel) and nuke_category and nuke_server (careful)
+def _confirm_check(ctx, target: str, *, casefold=True):
+    # wait_for check for the invoker typing `target` in this channel; it runs for every
+    # message in the channel, so ids are captured once and compared as plain ints, and
+    # the length test comes before the .lower() copy
+    author_id, channel_id = ctx.author.id, ctx.channel.id
+    if casefold:
+        target = target.lower()
+    def check(m):
+        if m.author.id != author_id or m.channel.id != channel_id or len(m.content) != len(target):
+            return False
+        return (m.content.lower() if casefold else m.content) == target
+    return check
+
 @bot.slash_command(description="Nuke this channel (Admin only)")
 async def nuke(ctx):
     if not is_owner_or_admin(ctx.author):
@@ -705,9 +1039,8 @@ async def nuke(ctx):
         return
     await ctx.respond("⚠️ Type `confirm` in chat within 20 seconds to proceed with channel nuke.")
     try:
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel and m.content.lower() == "confirm"
-        msg = await bot.wait_for("message", check=check, timeout=20)
+        async with async_timeout.timeout(20):
+            msg = await bot.wait_for("message", check=_confirm_check(ctx, "confirm"))
     except asyncio.TimeoutError:
         await ctx.channel.send("Nuke cancelled (timeout).")
         return
@@ -726,23 +1059,38 @@ async def nuke_category(ctx, category: discord.CategoryChannel):
     if not is_owner_or_admin(ctx.author):
         await ctx.respond("Owner/Admin only.")
         return
-    await ctx.respond("⚠️ Type `confirm category` in chat within 20 seconds to proceed.")
+    # defer so the interaction stays valid past the 3s window; everything after goes via followup
+    await ctx.defer()
+    await ctx.followup.send("⚠️ Type `confirm category` in chat within 20 seconds to proceed.")
     try:
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel and m.content.lower() == "confirm category"
-        msg = await bot.wait_for("message", check=check, timeout=20)
+        async with async_timeout.timeout(20):
+            msg = await bot.wait_for("message", check=_confirm_check(ctx, "confirm category"))
     except asyncio.TimeoutError:
-        await ctx.channel.send("Cancelled (timeout).")
+        await ctx.followup.send("Cancelled (timeout).")
         return
-    # clone channels then delete originals
-    channels = list(category.channels)
-    for ch in channels:
-        try:
-            await ch.clone(category=category, reason=f"Nuked by {ctx.author}")
-            await ch.delete()
-        except Exception:
-            pass
-    await ctx.send("Category nuked and recreated (where possible).")
+    # text channels are purged in place with the bulk-delete endpoint (py-cord falls back to
+    # single deletes for messages older than 14 days); other channel types are cloned then
+    # deleted. All channels run concurrently.
+    async def _reset(ch):
+        if isinstance(ch, discord.TextChannel):
+            try:
+                await ch.purge(limit=None, bulk=True, reason=f"Nuked by {ctx.author}")
+            except discord.HTTPException as e:
+                if e.code != 50034:  # "message too old to bulk delete"
+                    raise
+                await ch.purge(limit=None, bulk=False, reason=f"Nuked by {ctx.author}")
+            return
+        await ch.clone(category=category, reason=f"Nuked by {ctx.author}")
+        await ch.delete()
+    channels = category.channels  # py-cord builds a fresh list on every access, no copy needed
+    results = await asyncio.gather(*[_reset(ch) for ch in channels], return_exceptions=True)
+    for ch, res in zip(channels, results):
+        if isinstance(res, Exception):
+            print(f"nuke_category: could not reset #{ch.name} ({ch.id}): {res}")
+    try:
+        await ctx.followup.send("Category nuked: text channels purged, other channels recreated (where possible).")
+    except Exception:
+        pass  # the command's channel may have been one of the recreated ones
     record_command_usage(ctx, "nuke_category", f"category={category.id}")
 
 @bot.slash_command(description="Nuke server (owner only, very destructive!)")
@@ -750,38 +1098,42 @@ async def nuke_server(ctx):
     if ctx.author.id != OWNER_ID:
         await ctx.respond("Owner only.")
         return
-    await ctx.respond("⚠️ This will attempt to delete channels/roles. Type the SERVER NAME to confirm within 25s.")
+    await ctx.defer()
+    await ctx.followup.send("⚠️ This will attempt to delete channels/roles. Type the SERVER NAME to confirm within 25s.")
     try:
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel and m.content == ctx.guild.name
-        await bot.wait_for("message", check=check, timeout=25)
+        async with async_timeout.timeout(25):
+            await bot.wait_for("message", check=_confirm_check(ctx, ctx.guild.name, casefold=False))
     except asyncio.TimeoutError:
-        await ctx.channel.send("Cancelled.")
+        await ctx.followup.send("Cancelled.")
         return
     guild = ctx.guild
-    # try to delete channels
-    for ch in list(guild.channels):
-        try:
-            await ch.delete()
-        except Exception:
-            pass
-    # try to delete roles (skip @everyone)
-    for r in list(guild.roles)[1:]:
-        try:
-            await r.delete()
-        except Exception:
-            pass
-    await ctx.channel.send("Nuke attempted. Some items may remain (permissions).")
+    # at most 5 deletes in flight: overlaps round-trips without piling into the
+    # shared delete bucket and collecting 429s
+    sem = asyncio.Semaphore(5)
+    async def _del(x):
+        async with sem:
+            try:
+                await x.delete()
+            except Exception:
+                pass
+    # try to delete channels, then roles (skip @everyone)
+    # guild.channels / guild.roles already return new lists, so deleting while iterating is safe
+    await asyncio.gather(*[_del(ch) for ch in guild.channels])
+    await asyncio.gather(*[_del(r) for r in guild.roles[1:]])
+    try:
+        await ctx.followup.send("Nuke attempted. Some items may remain (permissions).")
+    except Exception:
+        pass  # the command's channel is usually gone by now
     record_command_usage(ctx, "nuke_server")
 
 # ---- react role management commands: list and remove
 @bot.slash_command(description="List reaction role messages")
 async def list_react_roles(ctx):
-    items = []
-    for mid, arr in REACT_ROLES.items():
-        items.append(f"Message ID {mid}: {len(arr)} roles")
+    global _react_roles_summary
+    if _react_roles_summary is None:
+        _react_roles_summary = "\n".join(f"Message ID {mid}: {len(arr)} roles" for mid, arr in REACT_ROLES.items())
     emb = make_basic_embed("React Roles")
-    emb.description = "\n".join(items) if items else "No reaction roles configured."
+    emb.description = _react_roles_summary or "No reaction roles configured."
     await ctx.respond(embed=emb)
     record_command_usage(ctx, "list_react_roles")
 
@@ -791,9 +1143,11 @@ async def remove_react_roles(ctx, message_id: str):
     if not is_owner_or_admin(ctx.author):
         await ctx.respond("Admin only.")
         return
-    if message_id in REACT_ROLES:
-        del REACT_ROLES[message_id]
-        save_json("react_roles.json", REACT_ROLES)
+    mid = int(message_id) if message_id.isdigit() else None
+    if mid in REACT_ROLES:
+        del REACT_ROLES[mid]
+        rebuild_react_roles_index()
+        DIRTY.add("react_roles.json")
         await ctx.respond("Removed.")
     else:
         await ctx.respond("Message ID not found.")
@@ -805,16 +1159,16 @@ async def logs(ctx):
     if not is_owner_or_admin(ctx.author):
         await ctx.respond("Admin only.")
         return
-    out = LOGS[-10:]
     emb = make_basic_embed("Recent Logs")
-    if not out:
+    if not LOGS:
         emb.description = "No logs yet."
     else:
-        for l in reversed(out):
-            t = l.get("ts","")
-            user = l.get("user_name") or str(l.get("user_id"))
-            command = l.get("command", l.get("type",""))
-            emb.add_field(name=f"{t} — {user}", value=f"{command} in channel {l.get('channel_name')} ({l.get('channel_id')})", inline=False)
+        # newest 10 straight off the deque, one description string instead of a field per entry
+        emb.description = "\n".join(
+            f"`{l.get('ts','')}` — {l.get('user_name') or l.get('user_id')}: "
+            f"{l.get('command', l.get('type',''))} in #{l.get('channel_name')} ({l.get('channel_id')})"
+            for l in itertools.islice(reversed(LOGS), 10)
+        )
     await ctx.respond(embed=emb)
     record_command_usage(ctx, "logs")
 
@@ -825,40 +1179,45 @@ async def usage(ctx, user: discord.User = None):
         await ctx.respond("Admin only.")
         return
     target = user or ctx.author
-    items = [l for l in LOGS if l.get("user_id") == target.id]
+    items = LOGS_BY_USER.get(target.id)
     emb = make_basic_embed(f"Usage for {target}")
     if not items:
         emb.description = "No usage found."
     else:
-        for i, l in enumerate(reversed(items[-20:]), start=1):
-            emb.add_field(name=f"{i}. {l.get('ts')}", value=f"{l.get('command')} in {l.get('channel_name')}", inline=False)
+        emb.description = "\n".join(
+            f"{i}. `{l.get('ts')}` — {l.get('command')} in #{l.get('channel_name')}"
+            for i, l in enumerate(reversed(items), start=1)
+        )
     await ctx.respond(embed=emb)
     record_command_usage(ctx, "usage", f"target={target.id}")
 
 # ---- ask (simple placeholder)
+_ASK_REPLIES = (
+    "Hmm... I think so.",
+    "Not sure, try again later.",
+    "Yes.",
+    "No.",
+    "I don't have enough data to answer that now."
+)
 @bot.slash_command(description="Ask the bot something (simple responses)")
 @option("question", str, description="Question to ask", required=True)
 async def ask(ctx, question: str):
     # This is a placeholder simple-answer system. You can wire an external AI by adding API key handling.
-    replies = [
-        "Hmm... I think so.",
-        "Not sure, try again later.",
-        "Yes.",
-        "No.",
-        "I don't have enough data to answer that now."
-    ]
-    await ctx.respond(random.choice(replies))
+    await ctx.respond(_rng.choice(_ASK_REPLIES))
     record_command_usage(ctx, "ask", question)
 
 # -------------------------
 # Run
 # -------------------------
+async def _save_all():
+    # encode on the loop, then write all files concurrently in worker threads
+    await asyncio.gather(*(
+        asyncio.to_thread(write_file_atomic, fn, dump_json(get()))
+        for fn, get in _JSON_STORES.items()
+    ))
+
 if __name__ == "__main__":
-    # ensure data files saved
-    save_json("settings.json", SETTINGS)
-    save_json("avatar_history.json", AVATAR_HISTORY)
-    save_json("react_roles.json", REACT_ROLES)
-    save_json("logs.json", LOGS)
-    save_json("afk.json", AFK)
+    # ensure data files saved (on the bot's own loop, before it starts running)
+    bot.loop.run_until_complete(_save_all())
 
     bot.run(TOKEN)